@@ -0,0 +1,102 @@
+"""
+Benchmark: blit cost of the game's assets per surface format.
+
+Every asset is blitted in three formats:
+- alpha: convert_alpha() (what every image used before)
+- colorkey: colorkey without RLE
+- optimized: what optimize_surface() picked (opaque / colorkey + RLE / alpha + RLE)
+
+run: python benchmarks/bench_blit.py [blits_per_asset]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import main as game
+
+
+def asset_set():
+    """(name, optimized surface) for the images the game draws"""
+    assets = [
+        ("floor tile", game.get_floor_tile()),
+        ("platform tile", game.get_platform_tile()),
+        ("breakable tile", game.get_breakable_tile()),
+        ("goal", game.GOAL_IMG),
+        ("coin", game.COIN_IMG),
+        ("heart full", game.HEART_FULL_IMG),
+        ("heart empty", game.HEART_EMPTY_IMG),
+        ("player run", game.player.SPRITES["run_right"][0]),
+        ("slime", game.ENEMY_SPRITES["idle_left"][0]),
+    ]
+    return assets
+
+
+def format_name(surface):
+    """format optimize_surface() picked for surface"""
+    if surface.get_colorkey() is not None:
+        return "colorkey"
+    if surface.get_flags() & pygame.SRCALPHA:
+        return "alpha"
+    return "opaque"
+
+
+def plain_alpha(surface):
+    """per-pixel alpha copy without RLE (convert_alpha() would keep RLE)"""
+    plain = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+    plain.blit(surface, (0, 0))
+    return plain.convert_alpha()
+
+
+def plain_colorkey(surface):
+    """colorkey copy without RLE, or None if surface is not colorkeyed"""
+    key = surface.get_colorkey()
+    if key is None:
+        return None
+    copy = surface.copy()
+    copy.set_colorkey(key)
+    return copy
+
+
+def time_blits(screen, surface, count):
+    """microseconds per blit"""
+    positions = [((i * 37) % 900, (i * 53) % 480) for i in range(count)]
+    screen.blit(surface, (0, 0))     # RLE surfaces encode on first blit
+    start = time.perf_counter()
+    for pos in positions:
+        screen.blit(surface, pos)
+    return (time.perf_counter() - start) * 1e6 / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    screen = game.screen
+
+    print(f"{'asset':<16}{'format':<10}{'alpha us':>10}{'colorkey us':>13}"
+          f"{'optimized us':>14}{'speedup':>9}")
+    totals = [0.0, 0.0]
+    for name, optimized in asset_set():
+        plain = plain_alpha(optimized)
+        kind = format_name(optimized)
+        alpha = time_blits(screen, plain, count)
+        keyed = plain_colorkey(optimized)
+        keyed_us = time_blits(screen, keyed, count) if keyed else None
+        best = time_blits(screen, optimized, count)
+        totals[0] += alpha
+        totals[1] += best
+        keyed_text = f"{keyed_us:.2f}" if keyed_us is not None else "-"
+        print(f"{name:<16}{kind:<10}{alpha:>10.2f}{keyed_text:>13}"
+              f"{best:>14.2f}{alpha / best:>8.2f}x")
+
+    print(f"{'total':<26}{totals[0]:>10.2f}{'':>13}{totals[1]:>14.2f}"
+          f"{totals[0] / totals[1]:>8.2f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
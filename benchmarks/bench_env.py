@@ -0,0 +1,49 @@
+"""
+Benchmark: environment steps per second with rendering disabled.
+
+run: python benchmarks/bench_env.py [num_envs] [steps] [columns] [enemies]
+
+Without columns the envs play level1.txt; with columns they play a
+generated map of that length (same generator as bench_rewind.py).
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_rewind import make_map
+from env import NUM_ACTIONS, VectorEnv
+
+
+def main():
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    cols = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    enemies = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+
+    rng = random.Random(0)
+    level_map = None
+    if cols is not None:
+        level_map = make_map(cols, enemies, rng)
+    env = VectorEnv(num_envs, level_map)
+    env.reset()
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = [rng.randrange(NUM_ACTIONS) for _ in range(num_envs)]
+        env.step(actions)
+    elapsed = time.perf_counter() - start
+
+    total = num_envs * steps
+    level = env.envs[0].level
+    print(f"{level.cols} columns, {len(level.platforms)} platforms, "
+          f"{len(level.enemies)} enemies, {len(level.coins)} coins")
+    print(f"{num_envs} envs x {steps} steps: {total / elapsed:,.0f} steps/s "
+          f"({elapsed * 1e6 / total:.1f} us/step)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: frame time of the particle pool with thousands of live particles.
+
+Keeps the pool close to full by emitting new effects every frame and
+reports update + draw time per frame and garbage collections during the run.
+
+run: python benchmarks/bench_particles.py [capacity] [frames]
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from particles import EFFECTS, ParticlePool
+
+WIDTH, HEIGHT = 960, 540
+
+
+def main():
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pool = ParticlePool(capacity)
+    rng = random.Random(0)
+    effects = list(EFFECTS)
+
+    collections = [0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            collections[0] += 1
+
+    gc.callbacks.append(on_gc)
+
+    times = []
+    live = []
+    offset_x = 0
+    for frame in range(frames):
+        # world twice as wide as the screen so half the particles get culled
+        while pool.count < capacity - 32:
+            pool.emit(rng.choice(effects), rng.uniform(0, 2 * WIDTH),
+                      rng.uniform(0, HEIGHT))
+        offset_x = (offset_x + 4) % WIDTH
+
+        start = time.perf_counter()
+        pool.update()
+        screen.fill((0, 0, 0))
+        pool.draw(screen, offset_x)
+        times.append(time.perf_counter() - start)
+        live.append(pool.count)
+
+    gc.callbacks.remove(on_gc)
+
+    times.sort()
+    ms = [t * 1000 for t in times]
+    print(f"capacity {capacity}, {frames} frames, "
+          f"avg {sum(live) / len(live):,.0f} live particles")
+    print(f"frame time ms: mean {sum(ms) / len(ms):.2f}  "
+          f"median {ms[len(ms) // 2]:.2f}  p99 {ms[int(len(ms) * 0.99)]:.2f}  "
+          f"max {ms[-1]:.2f}")
+    print(f"gc collections during run: {collections[0]}")
+
+
+if __name__ == "__main__":
+    main()
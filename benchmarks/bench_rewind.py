@@ -0,0 +1,90 @@
+"""
+Benchmark: rewind buffer memory per second of history and restore time.
+
+Plays a long generated level (many enemies and coins) with random input,
+records every tick, then seeks to random ticks in the buffer. Memory is
+compared with storing a full copy of player / enemies / coins / platforms
+every tick.
+
+run: python benchmarks/bench_rewind.py [columns] [enemies]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import main as game
+from rewind import RewindBuffer
+
+
+def make_map(cols, enemies, rng):
+    """flat level with floating platforms, coins and enemies"""
+    rows = [["."] * cols for _ in range(9)]
+    rows.append(["#"] * cols)
+    for _ in range(cols // 6):
+        rows[rng.randrange(4, 8)][rng.randrange(10, cols)] = "P"
+    for _ in range(cols // 4):
+        rows[rng.randrange(2, 8)][rng.randrange(10, cols)] = "C"
+    for _ in range(enemies):
+        rows[8][rng.randrange(10, cols)] = "E"
+    rows[8][cols - 2] = "G"
+    return ["".join(row) for row in rows]
+
+
+def full_copy_size(level, player):
+    """bytes of one naive full copy of the mutable world"""
+    size = sys.getsizeof(list(level.platforms)) + sys.getsizeof(dict(level.coins))
+    for e in level.enemies:
+        size += sys.getsizeof((tuple(e.rect), e.vx, e.vy, e.on_ground,
+                               e.direction, e.animation_count))
+    size += sys.getsizeof((tuple(player.rect), player.vx, player.vy,
+                           player.on_ground, player.direction,
+                           player.health, player.invincible_timer))
+    return size
+
+
+def main():
+    cols = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    enemies = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    seconds = game.REWIND_SECONDS
+
+    rng = random.Random(0)
+    level = game.create_level(make_map(cols, enemies, rng))
+    player = game.Player(100, 150, game.TILE_W, game.TILE_H)
+    player.health = 10 ** 6       # keep playing for the whole run
+    buffer = RewindBuffer(seconds, game.FPS)
+
+    ticks = 3 * seconds * game.FPS
+    keys = {pygame.K_a: False, pygame.K_d: True, pygame.K_SPACE: False}
+    for _ in range(ticks):
+        keys[pygame.K_SPACE] = rng.random() < 0.1
+        game.update_world(player, level, keys)
+        buffer.record(level, player)
+
+    naive = full_copy_size(level, player) * game.FPS
+    print(f"{cols} columns, {len(level.enemies)} enemies, "
+          f"{len(level.platforms)} platforms, {len(level.coins)} coins")
+    print(buffer.stats())
+    print(f"full copy every tick: {naive / 1024:.1f} KiB/s "
+          f"({naive / max(buffer.bytes_per_second(), 1):.1f}x more)")
+
+    times = []
+    for _ in range(200):
+        tick = rng.randrange(buffer.oldest(), buffer.newest + 1)
+        start = time.perf_counter()
+        buffer.seek(level, player, tick)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    frame_ms = 1000 / game.FPS
+    print(f"seek ms: median {times[len(times) // 2]:.3f}  max {times[-1]:.3f} "
+          f"(frame budget {frame_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Spatial hash broadphase for moving / pickup objects (enemies, coins).
+
+Objects are bucketed by the grid cells their rect overlaps, so a query only
+looks at objects near the query rect instead of the whole level.
+- coins never move: they stay in one hash and are removed on pickup
+- enemies move every frame: their hash is cleared and refilled each frame
+"""
+
+
+class SpatialHash:
+    """
+    Uniform grid of buckets keyed by (cell_x, cell_y).
+    Any object with a pygame.Rect in .rect can be stored.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.buckets = {}
+
+    def _cells(self, rect):
+        """cells overlapped by rect"""
+        size = self.cell_size
+        x0 = rect.left // size
+        x1 = (rect.right - 1) // size
+        y0 = rect.top // size
+        y1 = (rect.bottom - 1) // size
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def insert(self, obj):
+        """add obj under every cell its rect overlaps"""
+        buckets = self.buckets
+        for cell in self._cells(obj.rect):
+            bucket = buckets.get(cell)
+            if bucket is None:
+                buckets[cell] = [obj]
+            else:
+                bucket.append(obj)
+
+    def remove(self, obj):
+        """remove obj (its rect must not have moved since insert)"""
+        buckets = self.buckets
+        for cell in self._cells(obj.rect):
+            bucket = buckets.get(cell)
+            if bucket is not None and obj in bucket:
+                bucket.remove(obj)
+                if not bucket:
+                    del buckets[cell]
+
+    def query(self, rect):
+        """objects whose rect collides with rect"""
+        buckets = self.buckets
+        found = []
+        for cell in self._cells(rect):
+            bucket = buckets.get(cell)
+            if bucket is None:
+                continue
+            for obj in bucket:
+                # objects spanning several cells show up more than once
+                if obj not in found and rect.colliderect(obj.rect):
+                    found.append(obj)
+        return found
+
+    def rebuild(self, objects):
+        """replace the contents with objects (used for moving objects)"""
+        self.buckets.clear()
+        for obj in objects:
+            self.insert(obj)
+
+    def clear(self):
+        """remove everything"""
+        self.buckets.clear()
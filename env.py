@@ -0,0 +1,296 @@
+"""
+Gym-style environment around the platformer game logic.
+
+- PlatformerEnv: one world with reset() / step(action)
+- VectorEnv: N independent worlds stepped in one call
+
+Rendering is off by default, so the window / keyboard loop in main.py is
+never used and steps run as fast as the game logic allows.
+
+Example:
+
+    env = VectorEnv(8)
+    obs = env.reset()
+    obs, rewards, terminated, truncated, infos = env.step([2] * 8)
+"""
+
+import os
+
+# no window needed for training; main.py still calls set_mode / convert_alpha
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import main as game
+
+
+# --- Actions ---
+# each action is a fixed key state handed to Player.handle_input
+ACTION_NAMES = ["noop", "left", "right", "jump", "left_jump", "right_jump"]
+ACTION_KEYS = []
+for _name in ACTION_NAMES:
+    ACTION_KEYS.append({
+        pygame.K_a: "left" in _name,
+        pygame.K_d: "right" in _name,
+        pygame.K_SPACE: "jump" in _name,
+    })
+NUM_ACTIONS = len(ACTION_KEYS)
+
+# --- Observation ---
+# tile codes for the grid patch around the player
+TILE_CODES = {".": 0, "#": 1, "P": 2, "B": 3, "G": 4}
+TILE_OUTSIDE = 255          # outside the level
+PATCH_ROWS = 11             # patch size in tiles (centered on the player)
+PATCH_COLS = 15
+MAX_OBS_ENEMIES = 4         # nearest enemies in the observation
+MAX_OBS_COINS = 4           # nearest coins in the observation
+NEAREST_RADIUS = 400        # first search window (px) for nearest enemies / coins
+NEAREST_MAX_RADIUS = 3200   # enemies / coins further away are not observed
+
+# --- Rewards ---
+REWARD_COIN = 1.0
+REWARD_DAMAGE = -1.0
+REWARD_GOAL = 10.0
+REWARD_DEATH = -10.0
+REWARD_PROGRESS = 0.01      # per pixel of new rightmost progress
+
+MAX_EPISODE_STEPS = 3000
+
+
+def manhattan(offset):
+    return abs(offset[0]) + abs(offset[1])
+
+
+class PlatformerEnv:
+    """
+    One independent game world.
+
+    observation (dict):
+    - "tiles": bytes, PATCH_ROWS x PATCH_COLS tile codes around the player (row-major)
+    - "player": (x, y, vx, vy, on_ground)
+    - "health": remaining hearts
+    - "coins": coins collected this episode
+    - "enemies": (dx, dy) of the nearest enemies within NEAREST_MAX_RADIUS
+      (|dx| + |dy|), padded with (0, 0)
+    - "coin_positions": (dx, dy) of the nearest coins, same as enemies
+    - "goal": (dx, dy) to the goal, (0, 0) if the level has none
+    """
+
+    def __init__(self, level_map=None, max_steps=MAX_EPISODE_STEPS):
+        if level_map is None:
+            level_map = game.load_level_from_txt("level1.txt")
+        self.level_map = level_map
+        self.max_steps = max_steps
+
+        self.level = None
+        self.player = None
+        self.snapshot = None
+        self.tiles = None
+        self.pristine_tiles = None
+        self.coins = 0
+        self.steps = 0
+        self.best_x = 0
+
+    # --- gym API ---
+
+    def reset(self, seed=None):
+        """start a new episode, return first observation"""
+        if self.snapshot is None:
+            # build once, later episodes restore from the snapshot
+            self.level = game.create_level(self.level_map)
+            self.player = game.Player(100, 150, game.TILE_W, game.TILE_H)
+            self.snapshot = game.LevelSnapshot(self.level, self.player)
+            self.pristine_tiles = self._build_tile_grid()
+        else:
+            self.snapshot.restore(self.level, self.player)
+        # the enemy hash is otherwise only filled by update_world
+        self.level.enemy_hash.rebuild(self.level.enemies)
+        self.tiles = [bytearray(row) for row in self.pristine_tiles]
+        self.coins = 0
+        self.steps = 0
+        self.best_x = self.player.rect.x
+        return self.observe()
+
+    def step(self, action):
+        """
+        advance one frame with the given action index
+        return (obs, reward, terminated, truncated, info)
+        """
+        player = self.player
+        collected, damage, state = game.update_world(
+            player, self.level, ACTION_KEYS[action]
+        )
+        self.steps += 1
+        self.coins += collected
+
+        # keep the tile grid in sync with destroyed blocks
+        for block in player.broken_blocks:
+            row, col = self.level.tile_of(block.rect.x, block.rect.y)
+            self.tiles[row][col] = TILE_CODES["."]
+
+        reward = collected * REWARD_COIN + damage * REWARD_DAMAGE
+        if player.rect.x > self.best_x:
+            reward += (player.rect.x - self.best_x) * REWARD_PROGRESS
+            self.best_x = player.rect.x
+        if state == "GAME_OVER":
+            reward += REWARD_DEATH
+        elif state == "LEVEL_COMPLETE":
+            reward += REWARD_GOAL
+
+        terminated = state != "PLAYING"
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {"state": state, "steps": self.steps}
+        return self.observe(), reward, terminated, truncated, info
+
+    def render(self, surface, offset_x=None):
+        """draw the world onto a surface (debugging only)"""
+        if offset_x is None:
+            offset_x = max(0, min(self.player.rect.centerx - game.WIDTH // 2,
+                                  self.level.width - game.WIDTH))
+        surface.fill(game.WHITE)
+        for plat in self.level.platforms:
+            plat.draw(surface, offset_x)
+        for e in self.level.enemies:
+            e.draw(surface, offset_x)
+        for c in self.level.coins:
+            c.draw(surface, offset_x)
+        if self.level.goal is not None:
+            self.level.goal.draw(surface, offset_x)
+        self.player.draw(surface, offset_x)
+
+    # --- observation helpers ---
+
+    def _build_tile_grid(self):
+        """
+        static tile codes of the level, one bytearray per row
+        short rows are padded with empty tiles to the longest row
+        """
+        cols = max((len(row) for row in self.level_map), default=0)
+        grid = []
+        for row in self.level_map:
+            codes = bytearray(TILE_CODES.get(ch, 0) for ch in row)
+            codes.extend(bytes(cols - len(codes)))
+            grid.append(codes)
+        return grid
+
+    def _tile_patch(self):
+        """PATCH_ROWS x PATCH_COLS tiles centered on the player"""
+        level = self.level
+        row, col = level.tile_of(self.player.rect.centerx, self.player.rect.centery)
+        top = row - PATCH_ROWS // 2
+        left = col - PATCH_COLS // 2
+        right = left + PATCH_COLS
+
+        # columns clipped to the level, the rest padded
+        cols = len(self.tiles[0]) if self.tiles else 0
+        c0 = min(max(0, left), cols)
+        c1 = max(min(cols, right), c0)
+        pad_left = bytes([TILE_OUTSIDE]) * min(max(0, -left), PATCH_COLS)
+        pad_right = bytes([TILE_OUTSIDE]) * (PATCH_COLS - len(pad_left) - (c1 - c0))
+        empty_row = bytes([TILE_OUTSIDE]) * PATCH_COLS
+
+        patch = bytearray()
+        for r in range(top, top + PATCH_ROWS):
+            if 0 <= r < level.rows:
+                patch += pad_left
+                patch += self.tiles[r][c0:c1]
+                patch += pad_right
+            else:
+                patch += empty_row
+        return bytes(patch)
+
+    def _nearest(self, objects, spatial_hash, count):
+        """
+        (dx, dy) to the nearest objects, padded to count entries
+
+        The search window around the player starts at NEAREST_RADIUS and
+        doubles until it holds count objects within its radius (anything
+        outside is further away), every object, or reaches
+        NEAREST_MAX_RADIUS; objects further than that are left out.
+        """
+        level = self.level
+        px, py = self.player.rect.center
+        bounds = pygame.Rect(0, game.HEIGHT - level.rows * game.TILE_H,
+                             level.width, level.rows * game.TILE_H)
+        cell_size = spatial_hash.cell_size
+        radius = NEAREST_RADIUS
+        while True:
+            window = pygame.Rect(px - radius, py - radius, 2 * radius, 2 * radius)
+            window = window.clip(bounds)
+            cells = ((window.width // cell_size + 2)
+                     * (window.height // cell_size + 2))
+            if len(objects) <= cells:
+                # fewer objects than hash cells to visit: check them directly
+                found = [o for o in objects if window.colliderect(o.rect)]
+            else:
+                found = spatial_hash.query(window)
+            if len(found) == len(objects):
+                radius = NEAREST_MAX_RADIUS     # a wider window adds nothing
+            offsets = [(o.rect.centerx - px, o.rect.centery - py) for o in found]
+            offsets = [d for d in offsets if manhattan(d) <= radius]
+            if len(offsets) >= count or radius >= NEAREST_MAX_RADIUS:
+                break
+            radius *= 2
+        offsets.sort(key=manhattan)
+        offsets = offsets[:count]
+        offsets += [(0, 0)] * (count - len(offsets))
+        return tuple(offsets)
+
+    def observe(self):
+        """current observation dict"""
+        player = self.player
+        px, py = player.rect.center
+        goal = self.level.goal
+        if goal is None:
+            goal_offset = (0, 0)
+        else:
+            goal_offset = (goal.rect.centerx - px, goal.rect.centery - py)
+        return {
+            "tiles": self._tile_patch(),
+            "player": (player.rect.x, player.rect.y, player.vx, player.vy,
+                       int(player.on_ground)),
+            "health": player.health,
+            "coins": self.coins,
+            "enemies": self._nearest(self.level.enemies, self.level.enemy_hash,
+                                     MAX_OBS_ENEMIES),
+            "coin_positions": self._nearest(self.level.coins, self.level.coin_hash,
+                                            MAX_OBS_COINS),
+            "goal": goal_offset,
+        }
+
+
+class VectorEnv:
+    """
+    N independent PlatformerEnv worlds stepped together.
+    Finished worlds reset automatically; the last observation of the
+    finished episode is kept in info["final_observation"].
+    """
+
+    def __init__(self, num_envs, level_map=None, max_steps=MAX_EPISODE_STEPS):
+        if level_map is None:
+            level_map = game.load_level_from_txt("level1.txt")
+        self.num_envs = num_envs
+        self.envs = [PlatformerEnv(level_map, max_steps) for _ in range(num_envs)]
+
+    def reset(self, seed=None):
+        """reset all worlds, return list of observations"""
+        return [env.reset() for env in self.envs]
+
+    def step(self, actions):
+        """
+        step every world with its action
+        return lists (obs, rewards, terminated, truncated, infos)
+        """
+        obs, rewards, terminated, truncated, infos = [], [], [], [], []
+        for env, action in zip(self.envs, actions):
+            o, r, term, trunc, info = env.step(action)
+            if term or trunc:
+                info["final_observation"] = o
+                o = env.reset()
+            obs.append(o)
+            rewards.append(r)
+            terminated.append(term)
+            truncated.append(trunc)
+            infos.append(info)
+        return obs, rewards, terminated, truncated, infos
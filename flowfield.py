@@ -0,0 +1,164 @@
+"""
+Shared flow field (distance map) used by chasing enemies.
+
+One breadth-first search from the player's tile gives every empty cell its
+walking distance to the player. Every chasing enemy then steers with an
+O(1) lookup: step towards the neighbouring cell with the smaller distance.
+
+Slimes cannot jump, so the search follows their moves backwards:
+a cell is reached from its left / right neighbour if that neighbour stands
+on solid ground (walking), or from the empty cell above it (falling).
+"""
+
+import time
+from array import array
+from collections import deque
+
+UNREACHABLE = 0x7FFFFFFF
+
+
+class FlowField:
+    """
+    Distance map over a solid-tile grid (list of bytearray rows, 1 = solid).
+    - update(): recompute only if the target tile changed or mark_dirty() was called
+    - direction_at(): -1 / 0 / +1 steering for a world position
+
+    Only columns within `radius` of the target are searched, and only the
+    columns of the previous search are reset, so a recompute costs
+    rows * radius cells whatever the level length; enemies further away just
+    patrol. The distance array is allocated at full size only when the grid
+    size changes.
+    """
+
+    def __init__(self, solid, tile_w, tile_h, top_y, radius=40):
+        self.solid = solid
+        self.tile_w = tile_w
+        self.tile_h = tile_h
+        self.top_y = top_y          # world y of the first grid row
+        self.radius = radius        # search radius in columns
+
+        self.rows = 0
+        self.cols = 0
+        self.distance = array("i")
+        self.window = None          # (min_col, max_col) of the last search
+        self.target = None
+        self.dirty = True
+
+        # stats
+        self.recomputes = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+    def mark_dirty(self):
+        """grid changed (block broken, level edited): recompute on next update"""
+        self.dirty = True
+
+    def tile_of(self, x, y):
+        """world position -> (row, col)"""
+        return (y - self.top_y) // self.tile_h, x // self.tile_w
+
+    def ground_target(self, row, col):
+        """move a target cell down until it stands on solid ground"""
+        solid = self.solid
+        rows = len(solid)
+        row = max(0, min(row, rows - 1))
+        while row + 1 < rows and not solid[row + 1][col]:
+            row += 1
+        return row, col
+
+    def update(self, x, y):
+        """retarget on world position (x, y), recompute if needed"""
+        row, col = self.tile_of(x, y)
+        rows = len(self.solid)
+        cols = len(self.solid[0]) if rows > 0 else 0
+        if not (0 <= col < cols) or rows == 0:
+            return
+        target = self.ground_target(row, col)
+        if target == self.target and not self.dirty:
+            return
+        self.target = target
+        self.recompute()
+
+    def recompute(self):
+        """breadth-first search from the target over empty cells"""
+        start = time.perf_counter()
+
+        solid = self.solid
+        rows = len(solid)
+        cols = len(solid[0]) if rows > 0 else 0
+        distance = self.distance
+        if (rows, cols) != (self.rows, self.cols):
+            distance = self.distance = array("i", [UNREACHABLE]) * (rows * cols)
+        elif self.window is not None:
+            # only the last search window holds distances
+            lo, hi = self.window
+            blank = array("i", [UNREACHABLE]) * (hi - lo + 1)
+            for base in range(0, rows * cols, cols):
+                distance[base + lo:base + hi + 1] = blank
+        self.rows, self.cols = rows, cols
+
+        t_row, t_col = self.target
+        min_col = max(0, t_col - self.radius)
+        max_col = min(cols - 1, t_col + self.radius)
+        self.window = (min_col, max_col)
+        if not solid[t_row][t_col]:
+            first = t_row * cols + t_col
+            distance[first] = 0
+            queue = deque([first])
+            while queue:
+                cell = queue.popleft()
+                row, col = divmod(cell, cols)
+                d = distance[cell] + 1
+
+                # walk in from left / right (only from cells with ground below)
+                if row + 1 < rows:
+                    below = solid[row + 1]
+                    if (col > min_col and below[col - 1] and not solid[row][col - 1]
+                            and distance[cell - 1] > d):
+                        distance[cell - 1] = d
+                        queue.append(cell - 1)
+                    if (col < max_col and below[col + 1] and not solid[row][col + 1]
+                            and distance[cell + 1] > d):
+                        distance[cell + 1] = d
+                        queue.append(cell + 1)
+
+                # fall in from above
+                if row > 0 and not solid[row - 1][col] and distance[cell - cols] > d:
+                    distance[cell - cols] = d
+                    queue.append(cell - cols)
+
+        self.dirty = False
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.total_ms += self.last_ms
+        self.recomputes += 1
+
+    def direction_at(self, x, y):
+        """
+        steering for an enemy at world position (x, y)
+        return -1 (left), +1 (right) or 0 (no path / already there)
+        """
+        row, col = self.tile_of(x, y)
+        rows, cols = self.rows, self.cols
+        if not (0 <= row < rows and 0 <= col < cols):
+            return 0
+
+        distance = self.distance
+        cell = row * cols + col
+        here = distance[cell]
+        left = distance[cell - 1] if col > 0 else UNREACHABLE
+        right = distance[cell + 1] if col + 1 < cols else UNREACHABLE
+
+        best = min(left, right)
+        if best >= here:
+            return 0
+        return -1 if left < right else 1
+
+    def stats(self, frames, fps):
+        """one-line report of recompute time and frequency"""
+        if self.recomputes == 0:
+            return "flow field: no recomputes"
+        seconds = max(frames / fps, 1e-9)
+        return (f"flow field: {self.recomputes} recomputes in {frames} frames "
+                f"({self.recomputes / seconds:.1f}/s), "
+                f"avg {self.total_ms / self.recomputes:.3f} ms, "
+                f"last {self.last_ms:.3f} ms")
@@ -1,8 +1,15 @@
 import pygame
 import os
+import sys
+import time
 from os import listdir
 from os.path import isfile, join
 
+from broadphase import SpatialHash
+from flowfield import FlowField
+from particles import ParticlePool
+from rewind import RewindBuffer
+
 # ============================================================
 # 2D Platformer Final Project
 #
@@ -37,12 +44,17 @@ LEVEL_WIDTH = 0
 PLAYER_MAX_HEALTH = 3           # player max HP
 PLAYER_INVINCIBLE_FRAMES = 60   # invincibility frames (1s)
 
+PARTICLE_CAPACITY = 4096        # max live particles (block debris, sparkles, hits)
+
+BROADPHASE_CELL = 100           # spatial hash cell size for platforms / enemies / coins
+ENEMY_BUMP = True               # enemies turn around when they touch each other
+CHASE_RADIUS = 40               # chasing enemies follow the player within this many tiles
+
+REWIND_SECONDS = 5              # history kept for rewind (hold Q) and death replay (P)
+
 coin_count = 0          # coins collected
 TOTAL_COINS = 0         # total coins in level
 
-enemies = []            # list of Enemy 
-coins = []              # list of Coin
-
 # Physics parameters
 GRAVITY = 0.5
 JUMP_SPEED = -12
@@ -70,11 +82,62 @@ ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 # Tile / Helper: image & tile loading
 # ============================================================
 
+# colors tried as colorkey for sprites with on/off transparency
+COLORKEY_CANDIDATES = [(255, 0, 255), (0, 255, 255), (1, 2, 3)]
+
+
+def classify_surface(surface):
+    """
+    Look at the alpha channel of a surface.
+    return "opaque" (no transparent pixels), "colorkey" (every pixel is
+    fully opaque or fully transparent) or "alpha" (real blending needed)
+    """
+    total = surface.get_width() * surface.get_height()
+    opaque = pygame.mask.from_surface(surface, 254).count()   # alpha == 255
+    if opaque == total:
+        return "opaque"
+    visible = pygame.mask.from_surface(surface, 0).count()    # alpha > 0
+    if visible == opaque:
+        return "colorkey"
+    return "alpha"
+
+
+def optimize_surface(surface):
+    """
+    Convert a loaded surface to the cheapest format that looks the same:
+    - opaque: plain display format, no blending at all
+    - colorkey: colorkey + RLE, transparent runs are skipped when blitting
+    - alpha: per-pixel alpha + RLE (blends only the partly transparent runs)
+    Surfaces are RLE-encoded, so only use this for images that are never
+    drawn on afterwards.
+    """
+    kind = classify_surface(surface)
+    if kind == "opaque":
+        return surface.convert()
+
+    if kind == "colorkey":
+        total = surface.get_width() * surface.get_height()
+        transparent = total - pygame.mask.from_surface(surface, 254).count()
+        for key in COLORKEY_CANDIDATES:
+            keyed = pygame.Surface(surface.get_size()).convert()
+            keyed.fill(key)
+            keyed.blit(surface, (0, 0))
+            # the key color must not appear in the visible pixels
+            matches = pygame.mask.from_threshold(keyed, key, (1, 1, 1, 255)).count()
+            if matches == transparent:
+                keyed.set_colorkey(key, pygame.RLEACCEL)
+                return keyed
+
+    blended = surface.convert_alpha()
+    blended.set_alpha(255, pygame.RLEACCEL)
+    return blended
+
+
 def load_image(rel_path, size=None):
     img = pygame.image.load(os.path.join(ASSET_DIR, rel_path)).convert_alpha()
     if size is not None:
         img = pygame.transform.scale(img, size)
-    return img
+    return optimize_surface(img)
 
 
 # ---UI sprites ---
@@ -105,22 +168,28 @@ def get_tile(col, row):
     rect = pygame.Rect(col * SRC_TILE_W, row * SRC_TILE_H,
                        SRC_TILE_W, SRC_TILE_H)
     surface.blit(TERRAIN_SHEET, (0, 0), rect)
-    return pygame.transform.scale(surface, (TILE_W, TILE_H))
+    return optimize_surface(pygame.transform.scale(surface, (TILE_W, TILE_H)))
+
+
+# cut once, shared by every tile of that kind
+FLOOR_TILE = get_tile(col=1.37, row=0)          # grass floor
+PLATFORM_TILE = get_tile(col=2.366, row=0)      # floating platform
+BREAKABLE_TILE = get_tile(col=0, row=2)         # breakable block
 
 
 def get_floor_tile():
     # grass floor
-    return get_tile(col=1.37, row=0) 
+    return FLOOR_TILE
 
 
 def get_platform_tile():
     # floating platform
-    return get_tile(col=2.366, row=0)
+    return PLATFORM_TILE
 
 
 def get_breakable_tile():
     # breakable block
-    return get_tile(col=0, row=2)
+    return BREAKABLE_TILE
 
 
 def get_goal_tile():
@@ -133,6 +202,16 @@ def flip(sprites):
     return [pygame.transform.flip(sprite, True, False) for sprite in sprites]
 
 
+def flip_optimized(sprites):
+    """flip sprites already passed through optimize_surface"""
+    flipped = flip(sprites)
+    for sprite in flipped:
+        # flip keeps the colorkey + RLE, but drops RLE on per-pixel alpha
+        if sprite.get_flags() & pygame.SRCALPHA:
+            sprite.set_alpha(255, pygame.RLEACCEL)
+    return flipped
+
+
 def load_sprite_sheets(dir1, dir2, width, height, direction=False):
     """
     Load sprite sheets from assets/dir1/dir2 and slice into frames.
@@ -157,12 +236,12 @@ def load_sprite_sheets(dir1, dir2, width, height, direction=False):
 
             # scale player frames to one tile
             scaled = pygame.transform.scale(surface, (TILE_W, TILE_H))
-            sprites.append(scaled)
+            sprites.append(optimize_surface(scaled))
 
         name = image.replace(".png", "")
         if direction:
             all_sprites[name + "_right"] = sprites
-            all_sprites[name + "_left"] = flip(sprites)
+            all_sprites[name + "_left"] = flip_optimized(sprites)
         else:
             all_sprites[name] = sprites
 
@@ -198,13 +277,11 @@ def load_slime_sprites():
 
         # enemies also one tile big
         scaled = pygame.transform.scale(surface, (TILE_W, TILE_H))
-        sprites_right.append(scaled)
-
-    sprites_left = flip(sprites_right)
+        sprites_right.append(optimize_surface(scaled))
 
     return {
         "idle_right": sprites_right,
-        "idle_left": sprites_left,
+        "idle_left": flip_optimized(sprites_right),
     }
 
 
@@ -212,6 +289,9 @@ def load_slime_sprites():
 ENEMY_SPRITES = load_slime_sprites()
 ENEMY_BASE = "idle"
 
+# player sprite dict
+PLAYER_SPRITES = load_sprite_sheets("MainCharacters", "PinkMan", 32, 32, True)
+
 
 def get_background(name):
     """
@@ -269,15 +349,15 @@ class Goal:
     def __init__(self, x, y, w, h, color=GREEN, image=None):
         self.rect = pygame.Rect(x, y, w, h)
         self.color = color
+        # scale once here instead of every frame
+        if image is not None and image.get_size() != (w, h):
+            image = optimize_surface(pygame.transform.scale(image, (w, h)))
         self.image = image
 
     def draw(self, surface, offset_x):
         draw_rect = self.rect.move(-offset_x, 0)
         if self.image:
-            img = pygame.transform.scale(
-                self.image, (self.rect.width, self.rect.height)
-            )
-            surface.blit(img, draw_rect)
+            surface.blit(self.image, draw_rect)
         else:
             pygame.draw.rect(surface, self.color, draw_rect)
 
@@ -290,7 +370,7 @@ class Enemy:
     - Turns around when hitting wall or platform edge
     """
 
-    def __init__(self, x, y, w, h, speed=2):
+    def __init__(self, x, y, w, h, speed=2, chase=False):
         # physics rect
         self.rect = pygame.Rect(x, y, w, h)
 
@@ -301,6 +381,10 @@ class Enemy:
         self.on_ground = False
         self.direction = "left"
 
+        # chase mode: follow the level flow field towards the player
+        self.chase = chase
+        self.chasing = False
+
         # animation
         self.animation_count = 0
         self.ANIMATION_DELAY = 5
@@ -346,8 +430,8 @@ class Enemy:
             elif self.vx < 0:
                 self.rect.left = plat.rect.right
 
-        # Edge detection 
-        if self.on_ground:
+        # Edge detection (chasers drop down ledges on purpose)
+        if self.on_ground and not self.chasing:
             # small probe in front of enemy
             if self.vx > 0:
                 front_x = self.rect.right + 1
@@ -368,8 +452,21 @@ class Enemy:
 
         # Turn around 
         if hit_wall:
-            self.vx *= -1
-            self.direction = "right" if self.vx > 0 else "left"
+            self.turn_around()
+
+    def turn_around(self):
+        """reverse walking direction"""
+        self.vx *= -1
+        self.direction = "right" if self.vx > 0 else "left"
+
+    def bump(self, others):
+        """turn around when walking into another enemy"""
+        for other in others:
+            if other is self:
+                continue
+            if (self.vx > 0) == (other.rect.centerx > self.rect.centerx):
+                self.turn_around()
+                return
 
     def update_sprite(self):
         """update enemy sprite frame"""
@@ -379,8 +476,17 @@ class Enemy:
         self.sprite = sprites[index]
         self.animation_count += 1
 
-    def update(self, platforms):
+    def steer(self, flow):
+        """chase mode: face the way the flow field points"""
+        step = flow.direction_at(self.rect.centerx, self.rect.centery)
+        self.chasing = step != 0
+        if step != 0 and (step > 0) != (self.vx > 0):
+            self.turn_around()
+
+    def update(self, platforms, flow=None):
         """update enemy each frame"""
+        if self.chase and flow is not None:
+            self.steer(flow)
         self.apply_gravity()
         self.move_and_collide(platforms)
         self.update_sprite()
@@ -432,10 +538,8 @@ class Player(pygame.sprite.Sprite):
         self.animation_count = 0
         self.ANIMATION_DELAY = 5
 
-        # Load animation sequences
-        self.SPRITES = load_sprite_sheets(
-            "MainCharacters", "PinkMan", 32, 32, True
-        )
+        # Animation sequences (loaded once, shared by every Player)
+        self.SPRITES = PLAYER_SPRITES
         self.sprite = self.SPRITES["idle_right"][0]
 
         # Velocity
@@ -447,9 +551,16 @@ class Player(pygame.sprite.Sprite):
         self.health = PLAYER_MAX_HEALTH
         self.invincible_timer = 0
 
-    def handle_input(self):
-        """handle keyboard input"""
-        keys = pygame.key.get_pressed()
+        # breakable blocks destroyed during the last update
+        self.broken_blocks = []
+
+    def handle_input(self, keys=None):
+        """
+        handle keyboard input
+        keys: anything indexable by pygame key codes (defaults to the real keyboard)
+        """
+        if keys is None:
+            keys = pygame.key.get_pressed()
         self.vx = 0
 
         if keys[pygame.K_a]:
@@ -496,6 +607,7 @@ class Player(pygame.sprite.Sprite):
                 if isinstance(plat, BreakableBlock):
                     # destroy breakable block
                     platforms.remove(plat)
+                    self.broken_blocks.append(plat)
                     self.vy = 0
                 else:
                     self.rect.top = plat.rect.bottom
@@ -513,23 +625,26 @@ class Player(pygame.sprite.Sprite):
             elif self.vx < 0:
                 self.rect.left = plat.rect.right
 
-    def handle_horizontal_bounds(self):
+    def handle_horizontal_bounds(self, level_width=None):
         """keep player within level bounds"""
+        if level_width is None:
+            level_width = LEVEL_WIDTH
         if self.rect.left < 0:
             self.rect.left = 0
-        if self.rect.right > LEVEL_WIDTH:
-            self.rect.right = LEVEL_WIDTH
+        if self.rect.right > level_width:
+            self.rect.right = level_width
 
-    def update(self, platform_list):
+    def update(self, platform_list, keys=None, level_width=None):
         """main update per frame"""
         # decrease invincibility timer
         if self.invincible_timer > 0:
             self.invincible_timer -= 1
 
-        self.handle_input()
+        self.broken_blocks = []
+        self.handle_input(keys)
         self.apply_gravity()
         self.move_and_collide(platform_list)
-        self.handle_horizontal_bounds()
+        self.handle_horizontal_bounds(level_width)
         self.update_sprite()
 
     def update_sprite(self):
@@ -559,8 +674,7 @@ class Player(pygame.sprite.Sprite):
 # Scene & level loading
 # ============================================================
 
-platforms = []
-goal = None
+level = None            # current Level
 
 
 def load_level_from_txt(filename):
@@ -573,6 +687,7 @@ def load_level_from_txt(filename):
     B Breakable brick  
     G Goal  
     E Enemy  
+    S Chasing enemy  
     C Coin
     """
     base_path = os.path.dirname(os.path.abspath(__file__))
@@ -584,65 +699,502 @@ def load_level_from_txt(filename):
     return level_map
 
 
-def build_level_from_map(level_map):
+class Level:
+    """
+    Everything built from one char map: platforms, enemies, coins, goal.
+    Several levels can exist side by side (e.g. one per training env).
+    """
+
+    def __init__(self, level_map):
+        self.level_map = level_map
+        self.rows = len(level_map)
+        # longest row, the same as apply_level_diff (rows may differ in length)
+        self.cols = max((len(row) for row in level_map), default=0)
+        self.width = self.cols * TILE_W
+
+        self.platforms = []
+        self.enemies = []
+        # dict used as an ordered set: O(1) removal on pickup
+        self.coins = {}
+        self.goal = None
+        # (row, col) -> Goal for every G; the last one in scan order is used
+        self.goals = {}
+
+        # broadphase: platforms and coins never move (only get removed),
+        # enemies are re-hashed every frame
+        self.platform_hash = SpatialHash(BROADPHASE_CELL)
+        self.coin_hash = SpatialHash(BROADPHASE_CELL)
+        self.enemy_hash = SpatialHash(BROADPHASE_CELL)
+
+        # solid tiles (1 = platform / block) and the chase flow field over them
+        self.solid = [bytearray(self.cols) for _ in range(self.rows)]
+        self.flow = FlowField(self.solid, TILE_W, TILE_H,
+                              HEIGHT - self.rows * TILE_H, CHASE_RADIUS)
+        self.chasers = 0
+
+        # (row, col) -> object spawned from that char (used by hot reload)
+        self.tiles = {}
+
+    def tile_of(self, x, y):
+        """world position -> (row, col) in the char map"""
+        row = (y - HEIGHT) // TILE_H + self.rows
+        col = x // TILE_W
+        return row, col
+
+    def nearby_platforms(self, rect):
+        """
+        platforms around rect, enough for one frame of movement:
+        nothing moves more than one tile per frame
+        """
+        return self.platform_hash.query(rect.inflate(2 * TILE_W, 2 * TILE_H))
+
+    def add_tile(self, row_idx, col_idx, ch):
+        """create the object for one map char"""
+        if ch == ".":
+            return
+
+        x = col_idx * TILE_W
+        # first line -> top of screen
+        y = HEIGHT - (self.rows - row_idx) * TILE_H
+
+        if ch == "#":
+            floor_img = get_floor_tile()
+            obj = Platform(x, y, TILE_W, TILE_H, GREY, floor_img)
+            self.platforms.append(obj)
+
+        elif ch == "P":
+            plat_img = get_platform_tile()
+            obj = Platform(x, y, TILE_W, TILE_H, GREY, plat_img)
+            self.platforms.append(obj)
+
+        elif ch == "B":
+            obj = BreakableBlock(x, y, TILE_W, TILE_H)
+            self.platforms.append(obj)
+
+        elif ch == "G":
+            goal_img = get_goal_tile()
+            obj = Goal(x, y, TILE_W, TILE_H, image=goal_img)
+            self.goals[(row_idx, col_idx)] = obj
+            self.goal = obj
+
+        elif ch == "E":
+            obj = Enemy(x, y, TILE_W, TILE_H)
+            self.enemies.append(obj)
+
+        elif ch == "S":
+            obj = Enemy(x, y, TILE_W, TILE_H, chase=True)
+            self.enemies.append(obj)
+            self.chasers += 1
+
+        elif ch == "C":
+            obj = Coin(x + TILE_W // 2, y + TILE_H // 2)
+            self.coins[obj] = None
+            self.coin_hash.insert(obj)
+
+        else:
+            return
+
+        if ch in "#PB":
+            self.platform_hash.insert(obj)
+            self.solid[row_idx][col_idx] = 1
+            self.flow.mark_dirty()
+        self.tiles[(row_idx, col_idx)] = obj
+
+    def remove_tile(self, row_idx, col_idx):
+        """remove the object spawned from one map char (if still alive)"""
+        obj = self.tiles.pop((row_idx, col_idx), None)
+        if obj is None:
+            return
+
+        if self.solid[row_idx][col_idx]:
+            self.solid[row_idx][col_idx] = 0
+            self.flow.mark_dirty()
+        if isinstance(obj, Enemy) and obj.chase:
+            self.chasers -= 1
+
+        if isinstance(obj, Goal):
+            del self.goals[(row_idx, col_idx)]
+            self.update_goal()
+            return
+
+        if obj in self.coins:
+            self.remove_coin(obj)
+            return
+
+        # broken blocks / dead enemies are already gone
+        if obj in self.platforms:
+            self.platforms.remove(obj)
+            self.platform_hash.remove(obj)
+        elif obj in self.enemies:
+            self.enemies.remove(obj)
+
+    def update_goal(self):
+        """use the last goal in scan order, like create_level does"""
+        self.goal = self.goals[max(self.goals)] if self.goals else None
+
+    def block_broken(self, block):
+        """a breakable block was destroyed while playing"""
+        row, col = self.tile_of(block.rect.x, block.rect.y)
+        self.platforms.remove(block)
+        self.platform_hash.remove(block)
+        self.solid[row][col] = 0
+        self.flow.mark_dirty()
+
+    def remove_block(self, block):
+        """remove a breakable block (rewind); no-op if already broken"""
+        row, col = self.tile_of(block.rect.x, block.rect.y)
+        if self.solid[row][col]:
+            self.block_broken(block)
+
+    def restore_block(self, block):
+        """put a broken block back (rewind); no-op if it is there"""
+        row, col = self.tile_of(block.rect.x, block.rect.y)
+        if not self.solid[row][col]:
+            self.platforms.append(block)
+            self.platform_hash.insert(block)
+            self.solid[row][col] = 1
+            self.flow.mark_dirty()
+
+    def remove_coin(self, coin):
+        """remove a coin from the level and the coin hash"""
+        del self.coins[coin]
+        self.coin_hash.remove(coin)
+
+    def restore_coin(self, coin):
+        """put a collected coin back (rewind); no-op if it is there"""
+        if coin not in self.coins:
+            self.coins[coin] = None
+            self.coin_hash.insert(coin)
+
+
+def create_level(level_map):
     """
     Build platforms, enemies, coins, goal from char map
+    return: Level
     """
-    global platforms, goal, LEVEL_WIDTH
-    global enemies, coins, coin_count, TOTAL_COINS
+    level = Level(level_map)
 
-    rows = len(level_map)
-    cols = len(level_map[0]) if rows > 0 else 0
-    LEVEL_WIDTH = cols * TILE_W
+    for row_idx, row in enumerate(level_map):
+        for col_idx, ch in enumerate(row):
+            level.add_tile(row_idx, col_idx, ch)
+
+    return level
 
-    platforms = []
-    enemies = []
-    coins = []
-    goal = None
+
+def build_level_from_map(level_map):
+    """
+    Build the current level from char map and reset the coin counters
+    """
+    global level, LEVEL_WIDTH, coin_count, TOTAL_COINS
+
+    level = create_level(level_map)
+    LEVEL_WIDTH = level.width
 
     coin_count = 0
-    TOTAL_COINS = 0
+    # count coins after building
+    TOTAL_COINS = len(level.coins)
 
-    for row_idx, row in enumerate(level_map):
-        for col_idx, ch in enumerate(row):
-            if ch == ".":
-                continue
 
-            x = col_idx * TILE_W
-            # first line -> top of screen
-            y = HEIGHT - (rows - row_idx) * TILE_H
+def update_world(player, level, keys=None, effects=None):
+    """
+    Advance gameplay by one frame: player, enemies, coins, damage, goal.
+    keys: optional key state for the player (defaults to the real keyboard)
+    effects: optional ParticlePool for break / pickup / damage effects
 
-            if ch == "#":
-                floor_img = get_floor_tile()
-                platforms.append(Platform(x, y, TILE_W, TILE_H, GREY, floor_img))
+    return (coins_collected, damage_taken, state)
+    state is "PLAYING", "GAME_OVER" or "LEVEL_COMPLETE"
+    """
+    state = "PLAYING"
+
+    # update player (only the platforms near it are checked)
+    player.update(level.nearby_platforms(player.rect), keys, level.width)
+
+    for block in player.broken_blocks:
+        level.block_broken(block)
+        if effects is not None:
+            effects.emit("debris", *block.rect.center)
+
+    # chase flow field: only recomputed when the player's tile changes
+    # or a block was broken
+    flow = None
+    if level.chasers > 0:
+        flow = level.flow
+        flow.update(player.rect.centerx, player.rect.centery)
+
+    # update enemies
+    for e in level.enemies:
+        e.update(level.nearby_platforms(e.rect), flow)
+    level.enemy_hash.rebuild(level.enemies)
+
+    if ENEMY_BUMP:
+        for e in level.enemies:
+            e.bump(level.enemy_hash.query(e.rect))
+
+    # coin collection
+    collected = 0
+    for c in level.coin_hash.query(player.rect):
+        level.remove_coin(c)
+        collected += 1
+        if effects is not None:
+            effects.emit("sparkle", *c.rect.center)
+
+    # damage from enemy
+    damage = 0
+    for e in level.enemy_hash.query(player.rect):
+        if player.invincible_timer == 0:
+            player.health -= 1
+            damage += 1
+            player.invincible_timer = PLAYER_INVINCIBLE_FRAMES
+            if effects is not None:
+                effects.emit("hit", *player.rect.center)
+            if player.health <= 0:
+                state = "GAME_OVER"
+                break
+
+    if player.rect.top > HEIGHT + 200:
+        state = "GAME_OVER"
+
+    # check goal
+    if level.goal is not None and player.rect.colliderect(level.goal.rect):
+        state = "LEVEL_COMPLETE"
+
+    return collected, damage, state
 
-            elif ch == "P":
-                plat_img = get_platform_tile()
-                platforms.append(Platform(x, y, TILE_W, TILE_H, GREY, plat_img))
 
-            elif ch == "B":
-                platforms.append(BreakableBlock(x, y, TILE_W, TILE_H))
+# ============================================================
+# Snapshots (instant restart / checkpoints)
+# ============================================================
 
-            elif ch == "G":
-                goal_img = get_goal_tile()
-                goal = Goal(x, y, TILE_W, TILE_H, image=goal_img)
+class LevelSnapshot:
+    """
+    Mutable state of a level + player, captured once and restored in place.
 
-            elif ch == "E":
-                enemies.append(Enemy(x, y, TILE_W, TILE_H))
+    Platforms, coins and the goal never change while playing, they only get
+    removed, so the snapshot keeps references to the same objects and
+    restoring just refills the lists; only the removed blocks and coins go
+    back into the spatial hashes. Enemies and the player are moving,
+    so their fields are saved as small tuples.
+    """
 
-            elif ch == "C":
-                coins.append(Coin(x + TILE_W // 2, y + TILE_H // 2))
+    def __init__(self, level, player, coins_collected=0):
+        self.platforms = tuple(level.platforms)
+        self.blocks = tuple(p for p in level.platforms if isinstance(p, BreakableBlock))
+        self.coins = tuple(level.coins)
+        self.goal = level.goal
+        self.coins_collected = coins_collected
+        self.solid = tuple(bytes(row) for row in level.solid)
+
+        self.enemies = tuple(
+            (e, tuple(e.rect), e.vx, e.vy, e.on_ground, e.direction,
+             e.animation_count, e.sprite)
+            for e in level.enemies
+        )
+        self.player = (tuple(player.rect), player.vx, player.vy,
+                       player.on_ground, player.direction,
+                       player.animation_count, player.sprite,
+                       player.health, player.invincible_timer)
+
+    def restore(self, level, player):
+        """put level and player back to the captured state"""
+        # refill in place so other references to the lists stay valid
+        level.platforms[:] = self.platforms
+        for block in self.blocks:
+            row, col = level.tile_of(block.rect.x, block.rect.y)
+            if not level.solid[row][col]:
+                level.platform_hash.insert(block)
+        for c in self.coins:
+            if c not in level.coins:
+                level.coin_hash.insert(c)
+        level.coins.clear()
+        level.coins.update(dict.fromkeys(self.coins))
+        level.goal = self.goal
+        for solid_row, saved in zip(level.solid, self.solid):
+            solid_row[:] = saved
+        level.flow.mark_dirty()
+
+        enemies = []
+        for e, rect, vx, vy, on_ground, direction, anim, sprite in self.enemies:
+            e.rect.update(rect)
+            e.vx, e.vy = vx, vy
+            e.on_ground = on_ground
+            e.direction = direction
+            e.animation_count = anim
+            e.sprite = sprite
+            e.chasing = False
+            enemies.append(e)
+        level.enemies[:] = enemies
+
+        (rect, player.vx, player.vy, player.on_ground, player.direction,
+         player.animation_count, player.sprite, player.health,
+         player.invincible_timer) = self.player
+        player.rect.update(rect)
+        player.broken_blocks = []
+
+
+def restart_level():
+    """
+    Restart the current level from the pristine snapshot.
+    Falls back to a full rebuild if the map was hot-reloaded since.
+    """
+    global player, level_snapshot, camera_offset_x, coin_count
+
+    start = time.perf_counter()
+    if level_snapshot is None:
+        build_level_from_map(LEVEL_MAP)
+        player = Player(100, 150, TILE_W, TILE_H)
+        level_snapshot = LevelSnapshot(level, player)
+    else:
+        level_snapshot.restore(level, player)
+        coin_count = level_snapshot.coins_collected
+    camera_offset_x = 0
+    particles.clear()
+    rewind.clear()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Restart in {elapsed_ms:.2f} ms")
+
+
+# ============================================================
+# Hot reload (python main.py --watch)
+# ============================================================
 
-    # count coins after loops
-    TOTAL_COINS = len(coins)
+WATCH_INTERVAL = 15     # frames between file checks
+DIFF_CHUNK = 256        # chars compared at once when diffing a row
 
 
-LEVEL_MAP = load_level_from_txt("level1.txt")
+def changed_columns(old_row, new_row):
+    """
+    Columns where two map rows differ.
+    Rows are compared chunk by chunk first so long unchanged
+    stretches are skipped with a single string comparison.
+    """
+    width = max(len(old_row), len(new_row))
+    old_row = old_row.ljust(width, ".")
+    new_row = new_row.ljust(width, ".")
+
+    changed = []
+    for start in range(0, width, DIFF_CHUNK):
+        end = start + DIFF_CHUNK
+        if old_row[start:end] == new_row[start:end]:
+            continue
+        for col in range(start, min(end, width)):
+            if old_row[col] != new_row[col]:
+                changed.append(col)
+    return changed
+
+
+def apply_level_diff(level, new_map):
+    """
+    Update level in place so it matches new_map, rebuilding only the
+    tiles / entities whose char changed.
+
+    return number of changed tiles, or None if the row count changed
+    (every y position moves, so a full rebuild is needed)
+    """
+    if len(new_map) != level.rows:
+        return None
+
+    # grow the solid grid first if rows got longer
+    grid_cols = max((len(row) for row in new_map), default=0)
+    for solid_row in level.solid:
+        if len(solid_row) < grid_cols:
+            solid_row.extend(bytes(grid_cols - len(solid_row)))
+
+    changed = 0
+    for row_idx, (old_row, new_row) in enumerate(zip(level.level_map, new_map)):
+        if old_row == new_row:
+            continue
+
+        padded = new_row.ljust(len(old_row), ".")
+        for col_idx in changed_columns(old_row, new_row):
+            level.remove_tile(row_idx, col_idx)
+            level.add_tile(row_idx, col_idx, padded[col_idx])
+            changed += 1
+    # add_tile made the last *added* G the goal
+    level.update_goal()
+
+    level.level_map = new_map
+    level.cols = max((len(row) for row in new_map), default=0)
+    level.width = level.cols * TILE_W
+    return changed
+
+
+class LevelWatcher:
+    """
+    Polls a level file and returns the new map when it changes on disk.
+    """
+
+    def __init__(self, filename):
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        self.filename = filename
+        self.path = os.path.join(base_path, filename)
+        self.mtime = os.stat(self.path).st_mtime_ns
+
+    def poll(self):
+        """return new level map if the file changed, otherwise None"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            # editors may briefly remove the file while saving
+            return None
+
+        if mtime == self.mtime:
+            return None
+        try:
+            new_map = load_level_from_txt(self.filename)
+        except OSError:
+            # deleted / renamed mid-save: retry on the next poll
+            return None
+        self.mtime = mtime
+        return new_map
+
+
+def reload_level(new_map):
+    """
+    Apply an edited map to the running level; player and camera are kept.
+    """
+    global LEVEL_MAP, LEVEL_WIDTH, TOTAL_COINS, coin_count, level_snapshot
+    global game_state
+
+    start = time.perf_counter()
+    changed = apply_level_diff(level, new_map)
+    if changed is None:
+        # row count changed: rebuild, but keep collected coins
+        collected = coin_count
+        build_level_from_map(new_map)
+        coin_count = collected
+    LEVEL_MAP = new_map
+    LEVEL_WIDTH = level.width
+    TOTAL_COINS = coin_count + len(level.coins)
+    # pristine state no longer matches the map; rebuilt on next restart
+    level_snapshot = None
+    rewind.clear()
+    # the replay history is gone with it
+    if game_state == "REPLAY":
+        game_state = "GAME_OVER"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if changed is None:
+        print(f"Level reloaded (full rebuild) in {elapsed_ms:.2f} ms")
+    else:
+        print(f"Level reloaded: {changed} tiles changed in {elapsed_ms:.2f} ms")
+
+
+LEVEL_FILE = "level1.txt"
+LEVEL_MAP = load_level_from_txt(LEVEL_FILE)
 build_level_from_map(LEVEL_MAP)
 bg_tiles, bg_image = get_background("Blue.png")
 
 player = Player(100, 150, TILE_W, TILE_H)
 
+particles = ParticlePool(PARTICLE_CAPACITY)
+
+# recent history for rewind / replay
+rewind = RewindBuffer(REWIND_SECONDS, FPS)
+replay_tick = 0
+
+# pristine world state for instant restarts
+level_snapshot = LevelSnapshot(level, player)
+
 game_state = "PLAYING"  
 
 # camera offset (horizontal only)
@@ -685,23 +1237,27 @@ def draw_scene():
         screen.blit(bg_image, pos)
 
     # platforms
-    for plat in platforms:
+    for plat in level.platforms:
         plat.draw(screen, camera_offset_x)
 
     # enemies
-    for e in enemies:
+    for e in level.enemies:
         e.draw(screen, camera_offset_x)
 
     # coins
-    for c in coins:
+    for c in level.coins:
         c.draw(screen, camera_offset_x)
 
     # goal
-    goal.draw(screen, camera_offset_x)
+    if level.goal is not None:
+        level.goal.draw(screen, camera_offset_x)
 
     # player
     player.draw(screen, camera_offset_x)
 
+    # effects
+    particles.draw(screen, camera_offset_x)
+
     # --- hearts ---
     for i in range(PLAYER_MAX_HEALTH):
         x = 10 + i * (HEART_SIZE + 5)
@@ -724,10 +1280,14 @@ def draw_scene():
 
     elif game_state == "GAME_OVER":
         over = font.render("Game Over!", True, (200, 0, 0))
-        tip = font.render("Press R to restart", True, (0, 0, 0))
+        tip = font.render("Press R to restart, P to replay", True, (0, 0, 0))
         screen.blit(over, (WIDTH // 2 - over.get_width() // 2, HEIGHT // 3))
         screen.blit(tip, (WIDTH // 2 - tip.get_width() // 2, HEIGHT // 3 + 50))
 
+    elif game_state == "REPLAY":
+        replay = font.render("Replay", True, (200, 0, 0))
+        screen.blit(replay, (WIDTH // 2 - replay.get_width() // 2, 10))
+
     elif game_state == "LEVEL_COMPLETE":
         # Rating: 1~3 stars based on coin ratio
         if TOTAL_COINS == 0:
@@ -758,77 +1318,86 @@ def draw_scene():
 # Main game loop
 # ============================================================
 
-running = True
-while running:
-    clock.tick(FPS)
-
-    # event handling 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_ESCAPE]:
-        running = False
+if __name__ == "__main__":
+    # --watch: reload the level file when it is edited
+    watcher = LevelWatcher(LEVEL_FILE) if "--watch" in sys.argv[1:] else None
+    frame = 0
 
-    # state machine
-    if game_state == "START_MENU":
-        # start menu
-        if keys[pygame.K_RETURN]:
-            game_state = "PLAYING"
+    running = True
+    while running:
+        clock.tick(FPS)
+        frame += 1
 
-    elif game_state == "GAME_OVER":
-        # restart on R
-        if keys[pygame.K_r]:
-            build_level_from_map(LEVEL_MAP)
-            player = Player(100, 150, TILE_W, TILE_H)
-            camera_offset_x = 0
-            game_state = "PLAYING"
+        if watcher is not None and frame % WATCH_INTERVAL == 0:
+            new_map = watcher.poll()
+            if new_map is not None:
+                reload_level(new_map)
 
-    elif game_state == "LEVEL_COMPLETE":
-        # restart on R
-        if keys[pygame.K_r]:
-            build_level_from_map(LEVEL_MAP)
-            player = Player(100, 150, TILE_W, TILE_H)
-            camera_offset_x = 0
-            game_state = "PLAYING"
-
-    # main gameplay 
-    if game_state == "PLAYING":
-        # update player
-        player.update(platforms)
-
-        # update enemies
-        for e in enemies:
-            e.update(platforms)
-
-        # coin collection
-        for c in coins[:]:
-            if player.rect.colliderect(c.rect):
-                coins.remove(c)
-                coin_count += 1
-
-        # damage from enemy
-        for e in enemies:
-            if player.rect.colliderect(e.rect) and player.invincible_timer == 0:
-                player.health -= 1
-                player.invincible_timer = PLAYER_INVINCIBLE_FRAMES
-                if player.health <= 0:
-                    game_state = "GAME_OVER"
-                    break
-        
-        if player.rect.top > HEIGHT + 200:  
-            game_state = "GAME_OVER"
+        # event handling 
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
 
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_ESCAPE]:
+            running = False
 
-        # update camera
-        camera_offset_x = update_camera(player.rect, camera_offset_x)
-
-        # check goal
-        if player.rect.colliderect(goal.rect):
-            game_state = "LEVEL_COMPLETE"
-
-    # render one frame
-    draw_scene()
-
-pygame.quit()
+        # state machine
+        if game_state == "START_MENU":
+            # start menu
+            if keys[pygame.K_RETURN]:
+                game_state = "PLAYING"
+
+        elif game_state == "GAME_OVER":
+            # restart on R
+            if keys[pygame.K_r]:
+                restart_level()
+                game_state = "PLAYING"
+            # instant replay of the last seconds on P
+            elif keys[pygame.K_p] and rewind.newest >= 0:
+                replay_tick = max(rewind.oldest(),
+                                  rewind.newest - REWIND_SECONDS * FPS)
+                game_state = "REPLAY"
+
+        elif game_state == "REPLAY":
+            # play the recorded ticks, then back to the game over screen
+            if rewind.seek(level, player, replay_tick):
+                coin_count = TOTAL_COINS - len(level.coins)
+                camera_offset_x = update_camera(player.rect, camera_offset_x)
+                replay_tick += 1
+            if replay_tick > rewind.newest or replay_tick < rewind.oldest():
+                game_state = "GAME_OVER"
+
+        elif game_state == "LEVEL_COMPLETE":
+            # restart on R
+            if keys[pygame.K_r]:
+                restart_level()
+                game_state = "PLAYING"
+
+        # main gameplay 
+        if game_state == "PLAYING" and keys[pygame.K_q]:
+            # hold Q to rewind
+            if rewind.step_back(level, player):
+                coin_count = TOTAL_COINS - len(level.coins)
+                camera_offset_x = update_camera(player.rect, camera_offset_x)
+
+        elif game_state == "PLAYING":
+            collected, _, game_state = update_world(player, level,
+                                                    effects=particles)
+            coin_count += collected
+            rewind.record(level, player)
+
+            # update camera
+            camera_offset_x = update_camera(player.rect, camera_offset_x)
+
+        # effects keep playing on the status screens
+        particles.update()
+
+        # render one frame
+        draw_scene()
+
+    if level.chasers > 0:
+        print(level.flow.stats(frame, FPS))
+    print(rewind.stats())
+
+    pygame.quit()
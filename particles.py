@@ -0,0 +1,146 @@
+"""
+Pooled particle effects (block debris, coin sparkles, hit flashes).
+
+All particle data lives in fixed-size arrays allocated once, so spawning
+and killing particles never creates or frees Python objects per particle.
+Live particles are packed at the front of the arrays; a dead particle is
+replaced by the last live one (swap-remove).
+"""
+
+import random
+from array import array
+
+import pygame
+
+
+# effect name -> (colors, count, speed, gravity, lifetime in frames, size)
+EFFECTS = {
+    "debris": ([(160, 100, 40), (120, 70, 25), (90, 55, 20)], 14, 5.0, 0.4, 40, 6),
+    "sparkle": ([(255, 220, 60), (255, 250, 180), (255, 190, 0)], 10, 3.0, 0.05, 25, 4),
+    "hit": ([(255, 60, 60), (255, 255, 255)], 16, 4.0, 0.0, 15, 5),
+}
+
+FADE_STEPS = 4      # pre-rendered alpha levels per color
+
+
+class ParticlePool:
+    """
+    Fixed-capacity particle system.
+    - emit(): spawn an effect, extra particles are dropped when the pool is full
+    - update(): move every live particle in one pass
+    - draw(): blit the particles inside the camera view in one call
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+
+        # per-particle data (structure of arrays)
+        self.x = array("f", bytes(4 * capacity))
+        self.y = array("f", bytes(4 * capacity))
+        self.vx = array("f", bytes(4 * capacity))
+        self.vy = array("f", bytes(4 * capacity))
+        self.gravity = array("f", bytes(4 * capacity))
+        self.life = array("H", bytes(2 * capacity))
+        self.max_life = array("H", bytes(2 * capacity))
+        self.look = array("H", bytes(2 * capacity))    # index into self.images
+
+        # reusable (image, position) entries for Surface.blits
+        self.blit_slots = [[None, [0.0, 0.0]] for _ in range(capacity)]
+
+        # pre-rendered squares: one list of fade levels per (color, size)
+        self.images = []
+        self.image_index = {}
+        for colors, _, _, _, _, size in EFFECTS.values():
+            for color in colors:
+                key = (color, size)
+                if key in self.image_index:
+                    continue
+                fades = []
+                for step in range(FADE_STEPS):
+                    img = pygame.Surface((size, size))
+                    img.fill(color)
+                    img.set_alpha(255 * (FADE_STEPS - step) // FADE_STEPS)
+                    fades.append(img)
+                self.image_index[key] = len(self.images)
+                self.images.append(fades)
+
+    def emit(self, effect, x, y):
+        """spawn one effect centered at world position (x, y)"""
+        colors, count, speed, gravity, life, size = EFFECTS[effect]
+        for _ in range(count):
+            i = self.count
+            if i >= self.capacity:
+                return
+            self.count += 1
+
+            vx = (random.random() * 2 - 1) * speed
+            vy = (random.random() * 2 - 1) * speed
+            if gravity > 0:
+                vy -= speed * 0.5      # debris / sparkles pop upwards first
+
+            self.x[i] = x
+            self.y[i] = y
+            self.vx[i] = vx
+            self.vy[i] = vy
+            self.gravity[i] = gravity
+            lifetime = life // 2 + random.randrange(life // 2 + 1)
+            self.life[i] = lifetime
+            self.max_life[i] = lifetime
+            self.look[i] = self.image_index[(random.choice(colors), size)]
+
+    def update(self):
+        """advance all live particles by one frame"""
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        gravity, life, max_life, look = self.gravity, self.life, self.max_life, self.look
+
+        i = 0
+        while i < self.count:
+            if life[i] <= 1:
+                # swap-remove: move the last live particle into this slot
+                last = self.count - 1
+                x[i] = x[last]
+                y[i] = y[last]
+                vx[i] = vx[last]
+                vy[i] = vy[last]
+                gravity[i] = gravity[last]
+                life[i] = life[last]
+                max_life[i] = max_life[last]
+                look[i] = look[last]
+                self.count = last
+                continue
+
+            life[i] -= 1
+            vy[i] += gravity[i]
+            x[i] += vx[i]
+            y[i] += vy[i]
+            i += 1
+
+    def draw(self, surface, offset_x):
+        """draw particles visible with the given camera offset"""
+        left = offset_x - 8
+        right = offset_x + surface.get_width() + 8
+        bottom = surface.get_height() + 8
+        x, y, life, max_life, look = self.x, self.y, self.life, self.max_life, self.look
+        images = self.images
+        slots = self.blit_slots
+
+        visible = 0
+        for i in range(self.count):
+            px = x[i]
+            py = y[i]
+            if px < left or px > right or py < -8 or py > bottom:
+                continue
+            fade = (max_life[i] - life[i]) * FADE_STEPS // (max_life[i] + 1)
+            slot = slots[visible]
+            slot[0] = images[look[i]][fade]
+            pos = slot[1]
+            pos[0] = px - offset_x
+            pos[1] = py
+            visible += 1
+
+        surface.blits(slots[:visible], False)
+
+    def clear(self):
+        """remove all particles"""
+        self.count = 0
@@ -0,0 +1,287 @@
+"""
+Memory-bounded rewind buffer (hold-to-rewind, post-death replay).
+
+Every tick of world state goes into a fixed-size ring buffer:
+- keyframe (every KEYFRAME_INTERVAL ticks): full enemy + player state
+- other ticks: only what changed since the previous tick
+  (moved enemies, player fields, collected coins, broken blocks)
+
+Moved enemies are packed as 9-byte records (index, dx, dy, vx, vy * 2,
+on_ground); the rare move that does not fit in a byte is stored in full.
+vy always moves in 0.5 steps, so it is stored doubled as an int.
+Animation counters are not stored: they go up by one every tick, so they
+are derived from the distance to the keyframe.
+
+Coins and blocks are only ever removed while playing, so seeking just
+re-adds the ones removed after the target tick (and removes the rest).
+"""
+
+import struct
+import sys
+import time
+from array import array
+
+KEYFRAME_INTERVAL = 30
+ENEMY_FIELDS = 5        # x, y, vx, vy * 2, on_ground
+
+MOVED = struct.Struct("<Ibbbbb")        # index, dx, dy, vx, vy * 2, on_ground
+PLAYER = struct.Struct("<iibbbbih")     # x, y, vx, vy * 2, on_ground, right, health, invincible
+
+
+def enemy_state(e):
+    return (e.rect.x, e.rect.y, e.vx, int(e.vy * 2), int(e.on_ground))
+
+
+def player_state(p):
+    return PLAYER.pack(p.rect.x, p.rect.y, p.vx, int(p.vy * 2),
+                       int(p.on_ground), int(p.direction == "right"),
+                       p.health, p.invincible_timer)
+
+
+def fits_byte(*values):
+    for v in values:
+        if not -128 <= v <= 127:
+            return False
+    return True
+
+
+class RewindBuffer:
+    """
+    Ring buffer of the last `seconds` of world state.
+    - record(): call once per gameplay tick
+    - seek(): show the world at an older tick (history is kept, for replays)
+    - step_back(): seek one tick back and drop the newer history (rewind)
+    """
+
+    def __init__(self, seconds, fps):
+        self.fps = fps
+        # one extra keyframe interval so the full `seconds` stay restorable
+        self.capacity = seconds * fps + KEYFRAME_INTERVAL
+        self.entries = [None] * self.capacity
+        self.bytes = 0
+
+        # stats
+        self.restores = 0
+        self.total_restore_ms = 0.0
+        self.max_restore_ms = 0.0
+
+        self.clear()
+
+    def clear(self):
+        """drop all history (level restarted or reloaded)"""
+        for i in range(self.capacity):
+            self.entries[i] = None
+        self.bytes = 0
+        self.newest = -1            # last recorded tick
+        self.first = 0              # first tick still in the ring
+        self.last_enemies = []      # enemy states at the newest tick
+        self.last_player = None
+        self.known_coins = None     # coins still in the level at the newest tick
+
+    # --- recording ---
+
+    def record(self, level, player):
+        """store the world state after one gameplay tick"""
+        tick = self.newest + 1
+        enemies = level.enemies
+        states = [enemy_state(e) for e in enemies]
+        p_state = player_state(player)
+
+        moved = b""
+        wide = None
+        if tick % KEYFRAME_INTERVAL == 0:
+            keyframe = array("i")
+            for s in states:
+                keyframe.extend(s)
+            anims = array("i", [e.animation_count for e in enemies])
+            anims.append(player.animation_count)
+            keyframe = (keyframe, anims)
+        else:
+            keyframe = None
+            records = []
+            last = self.last_enemies
+            for i, s in enumerate(states):
+                old = last[i]
+                if s == old:
+                    continue
+                dx = s[0] - old[0]
+                dy = s[1] - old[1]
+                if fits_byte(dx, dy, s[2], s[3]):
+                    records.append(MOVED.pack(i, dx, dy, s[2], s[3], s[4]))
+                else:
+                    if wide is None:
+                        wide = array("i")
+                    wide.append(i)
+                    wide.extend(s)
+            moved = b"".join(records)
+
+        if p_state == self.last_player and keyframe is None:
+            stored_player = None
+        else:
+            stored_player = p_state
+
+        # coins collected this tick (the set is only diffed when the count drops)
+        if self.known_coins is None:
+            self.known_coins = set(level.coins)
+        coins = ()
+        if len(level.coins) != len(self.known_coins):
+            coins = tuple(c for c in self.known_coins if c not in level.coins)
+            self.known_coins.difference_update(coins)
+        blocks = tuple(player.broken_blocks)
+
+        entry = (tick, keyframe, stored_player, moved, wide, coins, blocks)
+        slot = tick % self.capacity
+        if self.entries[slot] is not None:
+            self.bytes -= self.entry_size(self.entries[slot])
+        self.entries[slot] = entry
+        self.bytes += self.entry_size(entry)
+
+        self.newest = tick
+        self.first = max(self.first, tick - self.capacity + 1)
+        self.last_enemies = states
+        self.last_player = p_state
+
+    @staticmethod
+    def entry_size(entry):
+        """approximate bytes used by one entry (shared empty values not counted)"""
+        size = sys.getsizeof(entry)
+        tick, keyframe, p_state, moved, wide, coins, blocks = entry
+        if keyframe is not None:
+            size += sys.getsizeof(keyframe) + sum(sys.getsizeof(a) for a in keyframe)
+        for part in (p_state, moved, wide, coins, blocks):
+            if part:
+                size += sys.getsizeof(part)
+        return size
+
+    # --- restoring ---
+
+    def oldest(self):
+        """oldest tick that can still be restored (-1 if empty)"""
+        if self.newest < 0:
+            return -1
+        # round up to a keyframe
+        return -(-self.first // KEYFRAME_INTERVAL) * KEYFRAME_INTERVAL
+
+    def entry(self, tick):
+        return self.entries[tick % self.capacity]
+
+    def seek(self, level, player, tick):
+        """
+        put the world into its state at `tick`
+        return False (and change nothing) if tick is not in the buffer
+        """
+        if not self.oldest() <= tick <= self.newest:
+            return False
+        start = time.perf_counter()
+
+        key_tick = tick - tick % KEYFRAME_INTERVAL
+        key_entry = self.entry(key_tick)
+        keyframe, anims = key_entry[1]
+
+        # enemies: keyframe + deltas up to tick, in one flat list
+        flat = keyframe.tolist()
+        p_state = key_entry[2]
+        for t in range(key_tick + 1, tick + 1):
+            _, _, stored_player, moved, wide, _, _ = self.entry(t)
+            if stored_player is not None:
+                p_state = stored_player
+            for i, dx, dy, vx, vy2, on_ground in MOVED.iter_unpack(moved):
+                base = i * ENEMY_FIELDS
+                flat[base] += dx
+                flat[base + 1] += dy
+                flat[base + 2] = vx
+                flat[base + 3] = vy2
+                flat[base + 4] = on_ground
+            if wide is not None:
+                for j in range(0, len(wide), ENEMY_FIELDS + 1):
+                    base = wide[j] * ENEMY_FIELDS
+                    flat[base:base + ENEMY_FIELDS] = wide[j + 1:j + 1 + ENEMY_FIELDS]
+
+        elapsed = tick - key_tick
+        base = 0
+        for e, anim in zip(level.enemies, anims):
+            e.rect.x = flat[base]
+            e.rect.y = flat[base + 1]
+            e.vx = flat[base + 2]
+            e.vy = flat[base + 3] / 2
+            e.on_ground = bool(flat[base + 4])
+            e.direction = "right" if e.vx > 0 else "left"
+            e.animation_count = anim + elapsed - 1
+            e.update_sprite()
+            base += ENEMY_FIELDS
+
+        (player.rect.x, player.rect.y, player.vx, vy2, on_ground, right,
+         player.health, player.invincible_timer) = PLAYER.unpack(p_state)
+        player.vy = vy2 / 2
+        player.on_ground = bool(on_ground)
+        player.direction = "right" if right else "left"
+        player.animation_count = anims[-1] + elapsed - 1
+        player.update_sprite()
+        player.broken_blocks = []
+
+        # coins / blocks: removed up to tick, present after it
+        for t in range(self.oldest(), self.newest + 1):
+            _, _, _, _, _, coins, blocks = self.entry(t)
+            gone = t <= tick
+            for c in coins:
+                if not gone:
+                    level.restore_coin(c)
+                elif c in level.coins:
+                    level.remove_coin(c)
+            for b in blocks:
+                if gone:
+                    level.remove_block(b)
+                else:
+                    level.restore_block(b)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.restores += 1
+        self.total_restore_ms += elapsed_ms
+        self.max_restore_ms = max(self.max_restore_ms, elapsed_ms)
+        return True
+
+    def truncate(self, tick):
+        """forget everything after tick; recording continues from there"""
+        for t in range(tick + 1, self.newest + 1):
+            slot = t % self.capacity
+            entry = self.entries[slot]
+            if self.known_coins is not None:
+                self.known_coins.update(entry[5])
+            self.bytes -= self.entry_size(entry)
+            self.entries[slot] = None
+        self.newest = tick
+
+    def step_back(self, level, player):
+        """
+        rewind one tick (the newest tick is dropped)
+        return False when there is nothing older to go back to
+        """
+        target = self.newest - 1
+        if target < self.oldest():
+            return False
+        self.seek(level, player, target)
+        self.truncate(target)
+        self.last_enemies = [enemy_state(e) for e in level.enemies]
+        self.last_player = player_state(player)
+        return True
+
+    # --- reporting ---
+
+    def seconds_stored(self):
+        if self.newest < 0:
+            return 0.0
+        return (self.newest - self.first + 1) / self.fps
+
+    def bytes_per_second(self):
+        seconds = self.seconds_stored()
+        return self.bytes / seconds if seconds > 0 else 0.0
+
+    def stats(self):
+        """one-line report of memory use and restore time"""
+        text = (f"rewind: {self.seconds_stored():.1f} s stored, "
+                f"{self.bytes / 1024:.1f} KiB "
+                f"({self.bytes_per_second() / 1024:.1f} KiB/s)")
+        if self.restores:
+            text += (f", restore avg {self.total_restore_ms / self.restores:.3f} ms"
+                     f" max {self.max_restore_ms:.3f} ms")
+        return text